@@ -0,0 +1,56 @@
+# pylint: disable=line-too-long,invalid-name
+"""
+Utils for a persistent (on-disk) key-value cache.
+
+The cache is a SQLite file, so it is shared between runs (and processes). Values are strings
+(e.g. JSON) and expire after a time-to-live.
+
+DiskCache provides get(key) and setex(key, ttl, value), so it can also be used wherever a
+redis.Redis client is expected (e.g. as the cache of ensembl_rest_utils.REST_API).
+"""
+import pathlib
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """
+    SQLite based key-value cache.
+
+    filename - the SQLite file (created, with its parent directories, if it does not exist).
+    ttl - default time to live (in seconds) of an item.
+    """
+    def __init__(self, filename: str | pathlib.Path, ttl: int):
+        pathlib.Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl: int = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            self._conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+
+    def get(self, key: str) -> str | None:
+        """Returns the value of key, or None if key is not in the cache (or expired)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return None if row is None else row[0]
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        """Sets the value of key, expiring after ttl seconds."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)", (key, value, time.time() + ttl))
+
+    def set(self, key: str, value: str) -> None:
+        """Sets the value of key, expiring after the default ttl."""
+        self.setex(key, self.ttl, value)
+
+    def close(self) -> None:
+        """Closes the cache file."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -22,11 +22,27 @@ For example (see https://rest.ensembl.org/documentation/info/ontology_name):
 Updated on 12/20/23 - using rest_api_utils.py
 """
 
-from functools import partial, partialmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable
+import asyncio
+import json
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
+from urllib3.util.retry import Retry
 
 import Utils.rest_api_utils as rsut
 
+try:
+    import httpx  # optional, required only by AsyncREST_API
+except ImportError:
+    httpx = None
+
+_log = logging.getLogger(__name__)
+
 # supported assemblies
 Ensembl_URLs: dict[str, str] = {
     'GRCh38': "https://rest.ensembl.org",
@@ -47,23 +63,139 @@ Ensb_gene_ID_preamble: str = 'ENSG'
 Ensb_transcript_ID_preamble: str = 'ENST'
 Ensb_exon_ID_preamble: str = 'ENSE'
 
+# request headers (shared between calls - do not modify)
+_JSON_HEADERS: dict[str, str] = {"Content-Type": "application/json"}
+_TEXT_HEADERS: dict[str, str] = {"Content-Type": "text/plain"}
+_JSON_POST_HEADERS: dict[str, str] = {"Content-Type": "application/json", "Accept": "application/json"}
+_CONTENT_TYPE_HEADERS: dict[str, dict[str, str]] = {
+    'application/json': _JSON_HEADERS,
+    'text/plain': _TEXT_HEADERS
+}
+
+# coordinate mapping URL templates (see the Conversions section of REST_API)
+_MAP_TEMPLATE: str = "{ext}/{id}/{s}..{e}?"
+_ASSEMBLY_MAP_TEMPLATE: str = "{ext}/{input_assembly}/{chrm}:{s}..{e}:{strand}/{output_assembly}?"
+
+
+def _content_type_headers(content_type: str) -> dict[str, str]:
+    """Returns the request headers of a content type."""
+    return _CONTENT_TYPE_HEADERS.get(content_type) or {"Content-Type": content_type}
+
+
+def _is_ensg(ID: str) -> bool:
+    """Returns True if ID is an Ensembl gene ID."""
+    return ID.startswith(Ensb_gene_ID_preamble)
+
+
+def _is_enst(ID: str) -> bool:
+    """Returns True if ID is an Ensembl transcript ID."""
+    return ID.startswith(Ensb_transcript_ID_preamble)
+
+# maximal number of (memoized) lookup responses kept per REST_API instance
+Lookup_cache_size: int = 4096
+
+# default options of lookup_id. Internal symbol lookups (see REST_API._resolve_info) use the same options, so the
+# memoized gene and transcripts of a symbol lookup are reused by subsequent lookup_id calls.
+Lookup_options: str = 'expand=1;utr=1'
+
+# maximal number of IDs per POST lookup request (see https://rest.ensembl.org/documentation/info/lookup_post)
+Lookup_bulk_max_ids: int = 1000
+
+# Ensembl allows 15 requests per second (per IP). We stay slightly below it.
+Ensembl_max_requests_per_second: int = 14
+
+# transient errors (e.g. 429 rate limit) are retried up to Max_retries times, with exponential backoff
+# (Retry_backoff_factor * 2**retry seconds) unless the server sends a Retry-After header.
+Max_retries: int = 8
+Retry_backoff_factor: float = 0.3
+Retry_status_codes: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+# time to live (in seconds) of responses stored in an external cache (see REST_API)
+Cache_ttl: int = 7 * 86400
+
 
 class REST_API():
-    """REST API class."""
-    def __init__(self, assembly: str = 'GRCh38'):
+    """
+    REST API class.
+
+    All requests are sent through a single (keep-alive) requests.Session, so consecutive calls reuse the
+    same connection to the server. Use the class as a context manager (or call close()) to release the connections.
+    Requests are rate limited to Ensembl_max_requests_per_second (shared by all threads using the instance), to avoid
+    the Retry-After penalties of exceeding the Ensembl rate limit.
+
+    lookup_id and lookup_symbol responses are memoized per instance (i.e. per assembly), so only the first lookup
+    of an ID hits the server. The transcripts contained in an (expanded) gene lookup are memoized as well, so a
+    subsequent lookup of any of them (with the same options) does not hit the server.
+    The returned dictionaries are shared between calls and should not be modified.
+
+    pool_connections - number of connection pools to cache.
+    pool_maxsize - maximal number of connections kept alive per pool. When calling the API from several threads
+                   (e.g. parallelizing get_transcripts_sizes_of_gene), set this to at least the number of workers.
+    cache - an optional redis.Redis client (or any object providing get(key) and setex(key, ttl, value)) used to
+            share GET responses between runs and processes. Keys include the Ensembl release, so a new release
+            does not return stale responses.
+    """
+    def __init__(self, assembly: str = 'GRCh38', pool_connections: int = 10, pool_maxsize: int = 32, cache=None):
         try:
             self.URL = Ensembl_URLs[assembly]
         except KeyError:
-            print(f"{assembly=} is not supported (only {','.join(list(Ensembl_URLs.keys()))} are supported) !!")
+            _log.error("assembly=%r is not supported (only %s are supported) !!", assembly, ','.join(Ensembl_URLs))
             raise
-        self.endpoint_get_base = partial(rsut.endpoint_get_base, server=self.URL)
-        self.endpoint_post_base = partial(rsut.endpoint_post_base, server=self.URL)
+        # transient errors (e.g. 429 rate limit) are retried with exponential backoff, honoring Retry-After.
+        # Once retries are exhausted the last response is returned (and reported by rest_api_utils.endpoint_base).
+        retry = Retry(total=Max_retries, backoff_factor=Retry_backoff_factor, status_forcelist=Retry_status_codes,
+                      respect_retry_after_header=True, allowed_methods=frozenset(['GET', 'POST']), raise_on_status=False)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.headers['Accept-Encoding'] = 'gzip, deflate'  # compressed responses (decompressed by requests)
+
+        # all requests (of all threads) are rate limited together to Ensembl_max_requests_per_second
+        self._bucket = rsut.TokenBucket(rate=Ensembl_max_requests_per_second, capacity=Ensembl_max_requests_per_second)
+        self.endpoint_get_base = rsut.rate_limited_endpoint(
+            partial(rsut.endpoint_get_base, server=self.URL, session=self._session), self._bucket)
+        self.endpoint_post_base = rsut.rate_limited_endpoint(
+            partial(rsut.endpoint_post_base, server=self.URL, session=self._session), self._bucket)
+
+        if cache is not None:
+            release = '.'.join(str(x) for x in self.get_release_info().get('releases', ['unknown']))
+            self.endpoint_get_base = rsut.cached_endpoint(self.endpoint_get_base, cache,
+                                                          key_prefix=f"ensembl:{release}:{self.URL}:", ttl=Cache_ttl)
+
+        # memoized lookups, keyed by (lookup type, ID, options)
+        self._lookup_cache = rsut.LRUCache(maxsize=Lookup_cache_size)
+
+    def map_parallel(self, fn: Callable | str, items: Iterable, workers: int = 8) -> list:
+        """
+        Applies fn to each item concurrently (over the session's connection pool), and returns the results
+        in the order of items. fn is either a callable or the name of a REST_API method (e.g. 'get_transcript_sizes').
+
+        The requests of all threads are rate limited together to Ensembl_max_requests_per_second.
+        workers should not exceed pool_maxsize.
+        """
+        func = getattr(self, fn) if isinstance(fn, str) else fn
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+    def clear_lookup_cache(self) -> None:
+        """Clears the memoized lookup_id and lookup_symbol responses."""
+        self._lookup_cache.clear()
+
+    def close(self) -> None:
+        """Closes the underlying session."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     """
     Lookup endpoint
     ===============
     """
-    def lookup_endpoint_base(self, ID: str, typ: str, headers: dict, options: str = 'expand=1;utr=1') -> dict | str:
+    def lookup_endpoint_base(self, ID: str, typ: str, headers: dict, options: str = Lookup_options) -> dict | str:
         """
         Base lookup command.
         options - a ';' separated option=value string. See https://rest.ensembl.org/documentation/info/lookup.
@@ -71,17 +203,60 @@ class REST_API():
         return self.endpoint_get_base(ext=f"/lookup/{typ}/{ID}?{options}", headers=headers)
 
 
-    """look_id(ID). Information about a given ID. For example, look_id('ENSG00000172818')"""
-    lookup_id = partialmethod(lookup_endpoint_base, typ='id', headers={"Content-Type": "application/json"})
+    def _lookup_cached(self, ID: str, typ: str, options: str) -> dict | str:
+        """Memoized lookup. Failed lookups are not memoized."""
+        if (info := self._lookup_cache.get((typ, ID, options))) is None:
+            if info := self.lookup_endpoint_base(ID, typ, _JSON_HEADERS, options=options):
+                self._lookup_cache[(typ, ID, options)] = info
+                if isinstance(info, dict):
+                    if typ == 'symbol':
+                        self._lookup_id_cache_put(info['id'], info, options)
+                    # prefetch: the transcripts of an expanded gene have the same content as their own lookup
+                    for transcript in info.get('Transcript', []):
+                        self._lookup_id_cache_put(transcript['id'], transcript, options)
+        return info
+
+
+    def _lookup_id_cache_put(self, ID: str, info: dict, options: str) -> None:
+        """Memoizes the lookup_id information of ID (unless already memoized)."""
+        if ('id', ID, options) not in self._lookup_cache:
+            self._lookup_cache[('id', ID, options)] = info
+
+
+    def lookup_id(self, ID: str, options: str = Lookup_options) -> dict | str:
+        """Information about a given ID. For example, lookup_id('ENSG00000172818')."""
+        return self._lookup_cached(ID, 'id', options)
 
     def lookup_symbol(self, symbol: str, species: str = 'homo_sapiens', options: str = 'expand=1') -> dict:
         """Information about a gene symbol (e.g. MET) of a species."""
-        return self.lookup_endpoint_base(f"{species}/{symbol}", 'symbol', {"Content-Type": "application/json"}, options=options)
+        return self._lookup_cached(f"{species}/{symbol}", 'symbol', options)
+
+    def lookup_ids_bulk(self, ids: list[str], options: str = 'expand=1') -> dict:
+        """
+        Information about a list of IDs, retrieved with POST requests of up to Lookup_bulk_max_ids IDs each.
+        Returns a dictionary with keys that are the IDs and values that are the corresponding information
+        (None for IDs that were not found).
+        The information of each found ID is memoized, so subsequent lookup_id calls (with the same options) reuse it.
+        """
+        info: dict = {}
+        for i in range(0, len(ids), Lookup_bulk_max_ids):
+            info |= self.endpoint_post_base(ext=f"/lookup/id?{options}",
+                                            headers=_JSON_POST_HEADERS,
+                                            data=json.dumps({"ids": ids[i:i+Lookup_bulk_max_ids]}))
+        for ID, id_info in info.items():
+            if isinstance(id_info, dict):
+                self._lookup_id_cache_put(ID, id_info, options)
+        return info
+
+
+    def _resolve_info(self, gene: str, *, symbol_options: str = Lookup_options) -> dict:
+        """Information about a gene, defined by either its ENSG ID or its symbol name (e.g. MET)."""
+        return self.lookup_id(gene) if _is_ensg(gene) else self.lookup_symbol(gene, options=symbol_options)
 
 
     def get_canonical_transcript(self, gene: str) -> str:
         """Given a gene, returns it 'canonical' transcript by Ensembl. 'gene' can be an ENSG ID or a symbol (e.g., MET)."""
-        return self.lookup_id(gene)['canonical_transcript'] if Ensb_gene_ID_preamble in gene else self.lookup_symbol(gene)['canonical_transcript']
+        return self._resolve_info(gene)['canonical_transcript']
 
 
     def get_transcripts_of_gene(self, gene: str) -> dict:
@@ -89,10 +264,32 @@ class REST_API():
         Given a gene (defined by either its ENSG ID or its symbol name (e.g. MET)), the function returns
         a dictionary with keys that are transcript IDs and values that are the biotype.
         """
-        info = self.lookup_id(gene) if Ensb_gene_ID_preamble in gene else self.lookup_symbol(gene)
+        info = self._resolve_info(gene)
         return {x['id']: x['biotype'] for x in info['Transcript']}
 
 
+    def get_transcript_info(self, trans_id: str) -> dict[str, int]:
+        """
+        Given a transcript ID (ENST), the function returns a dictionary containing (from a single lookup):
+        'tss', 'tes' - the (primary) transcript start and end site coordinates (see get_transcript_start_end),
+        'rna_len' - the transcript (RNA) size in bps,
+        'aa_len' - the protein size in AAs (-1 if the transcript is not a protein-coding transcript).
+
+        All values are set to -1 if trans_id is not a transcript ID.
+        """
+        if not _is_enst(trans_id):
+            _log.warning("get_transcript_info: input ID must be a transcript ID (i.e. a %s ID) and not %s !!", Ensb_transcript_ID_preamble, trans_id)
+            return {'tss': -1, 'tes': -1, 'rna_len': -1, 'aa_len': -1}
+        info = self.lookup_id(trans_id)
+        tss, tes = (info['start'], info['end']) if info['strand'] == 1 else (info['end'], info['start'])
+        return {
+            'tss': tss,
+            'tes': tes,
+            'rna_len': info['length'],
+            'aa_len': info['Translation']['length'] if 'Translation' in info else -1
+        }
+
+
     def get_transcript_start_end(self, trans_id: str) -> tuple[int, int]:
         """
         Given a transcript ID (ENST), the function returns a tuple containing (TSS, TES), i.e.
@@ -101,11 +298,8 @@ class REST_API():
         
         Note that TSS > TES for transcripts encoded on the negative strand, otherwise TSS < TES.
         """
-        if Ensb_transcript_ID_preamble not in trans_id:
-            print(f"get_transcripts_sizes: input ID must be a transcript ID (i.e. a {Ensb_transcript_ID_preamble} ID) and not {trans_id} !!")
-            return -1, -1
-        info = self.lookup_id(trans_id)
-        return (info['start'], info['end']) if info['strand'] == 1 else (info['end'], info['start'])
+        info = self.get_transcript_info(trans_id)
+        return info['tss'], info['tes']
 
 
     def get_transcript_sizes(self, trans_id: str) -> tuple[int, int]:
@@ -115,12 +309,8 @@ class REST_API():
 
         If the transcript is not a protein-coding transcript, the AA size returned is set to -1. 
         """
-        if Ensb_transcript_ID_preamble not in trans_id:
-            print(f"get_transcripts_sizes: input ID must be a transcript ID (i.e. a {Ensb_transcript_ID_preamble} ID) and not {trans_id} !!")
-            return -1, -1
-        info = self.lookup_id(trans_id)
-        aa_len = info['Translation']['length'] if 'Translation' in info else -1
-        return info['length'], aa_len
+        info = self.get_transcript_info(trans_id)
+        return info['rna_len'], info['aa_len']
 
 
     def get_transcripts_sizes_of_gene(self, gene: str) -> dict:
@@ -131,8 +321,9 @@ class REST_API():
 
         If the transcript is not a protein-coding transcript, the AA size returned is set to -1. 
         """
-        info = self.lookup_id(gene) if Ensb_gene_ID_preamble in gene else self.lookup_symbol(gene)
-        return {x['id']: self.get_transcript_sizes(x['id']) for x in info['Transcript']}
+        # the (expanded) gene information already contains the information of all its transcripts
+        info = self._resolve_info(gene)
+        return {x['id']: (x['length'], x['Translation']['length'] if 'Translation' in x else -1) for x in info['Transcript']}
 
 
     def get_gene_strand(self, gene: str) -> int:
@@ -140,7 +331,7 @@ class REST_API():
         Given a gene (defined by either its ENSG ID or its symbol name (e.g. MET)), the function returns
         1 [-1] if the gene is encoded on the forward [reveresed] DNA strand.
         """
-        return int(self.lookup_id(gene)['strand']) if Ensb_gene_ID_preamble in gene else int(self.lookup_symbol(gene)['strand'])
+        return int(self._resolve_info(gene)['strand'])
 
 
     def get_transcript_version(self, trans_id: str) -> str:
@@ -163,28 +354,28 @@ class REST_API():
     """
     def get_release_info(self, content_type: str = 'application/json') -> dict | str:
         """Shows the data releases available on the REST server."""
-        return self.endpoint_get_base(ext="/info/data/?", headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext="/info/data/?", headers=_content_type_headers(content_type))
 
 
     def get_assembly_info(self, ext: str = "/info/assembly/homo_sapiens?", content_type: str = 'application/json', params: dict = None) -> dict | str:
         """Get assembly information."""
-        return self.endpoint_get_base(ext=ext, headers={"Content-Type" : content_type}, params=params)
+        return self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type), params=params)
 
 
     def get_assembly_chromosome_info(self, chrm_num: str, ext: str = "/info/assembly/homo_sapiens", content_type: str = 'application/json', params: dict = None) -> dict | str:
         """Get assembly information of a given chromosome. chrm_num is a single character (e.g., '1', or 'X')."""
-        return self.endpoint_get_base(ext=f"{ext}/{chrm_num.upper()}", headers={"Content-Type" : content_type}, params=params)
+        return self.endpoint_get_base(ext=f"{ext}/{chrm_num.upper()}", headers=_content_type_headers(content_type), params=params)
 
 
     def get_consequence_types(self, ext: str = "/info/variation/consequence_types?", content_type: str = 'application/json') -> dict | str:
         """Information on all consequence types."""
-        return self.endpoint_get_base(ext=ext, headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type))
 
 
     def is_protein_coding(self, trans_id: str) -> bool:
         """Returns True [False] if the transcript ID trans_id is [is not] a coding protein transcript."""
-        if Ensb_transcript_ID_preamble not in trans_id:
-            print(f"Input ({trans_id}) must be a valid transcript ID (i.e. a {Ensb_transcript_ID_preamble} ID) !!")
+        if not _is_enst(trans_id):
+            _log.warning("Input (%s) must be a valid transcript ID (i.e. a %s ID) !!", trans_id, Ensb_transcript_ID_preamble)
             return False
         return self.lookup_id(trans_id)['biotype'] == 'protein_coding'
 
@@ -195,22 +386,35 @@ class REST_API():
     """
     def get_UTRs(self, trans_id: str) -> tuple[str, str]:
         """Return a tuple containing the 5'UTR (first item) followed by the 3'UTR (second item) sequences of a transcript."""
+        utr5, utr3 = self.get_UTRs_bytes(trans_id)
+        return str(utr5, 'ascii'), str(utr3, 'ascii')
+
+
+    def get_UTRs_bytes(self, trans_id: str) -> tuple[memoryview, memoryview]:
+        """
+        Same as get_UTRs, but the UTR sequences are returned as (zero-copy) memoryviews over the mRNA bytes.
+        Use bytes(...) or str(..., 'ascii') to materialize them.
+        """
         try:
-            mrna = self.sequence_endpoint_base(trans_id, seq_type='cdna')
-            cds = self.sequence_endpoint_base(trans_id, seq_type='cds')
+            # the two sequences are retrieved concurrently (over the session's keep-alive connections)
+            # (as bytes, so that the - possibly long - mRNA is not decoded before searching it)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                mrna, cds = executor.map(partial(self.sequence_endpoint_base, trans_id, as_bytes=True), ['cdna', 'cds'])
         except HTTPError:
-            print(f"Can not retrieve mRNA and/or CDS of the transcript {trans_id}. Make sure this is a protein-coding transcript !!")
+            _log.error("Can not retrieve mRNA and/or CDS of the transcript %s. Make sure this is a protein-coding transcript !!", trans_id)
             raise
         else:
+            mv = memoryview(mrna)
             if (index := mrna.find(cds)) == -1:  # index is 0-based
-                print(f"Can not find the CDS sequence in the mRNA sequence for {trans_id} .......")
-                return '', ''
-            return mrna[:index], mrna[index+len(cds):]
+                _log.warning("Can not find the CDS sequence in the mRNA sequence for %s .......", trans_id)
+                return mv[:0], mv[:0]
+            return mv[:index], mv[index+len(cds):]
 
 
-    def sequence_endpoint_base(self, ID: str, seq_type: str = None, content_type: str =  "text/plain") -> dict | str:
+    def sequence_endpoint_base(self, ID: str, seq_type: str = None, content_type: str =  "text/plain", as_bytes: bool = False) -> dict | str | bytes:
         """
         Get a sequence of an ID.
+        Set as_bytes=True to get the (plain text) sequence as bytes (not supported for the UTR seq_types).
         
         If ID is a transcript ID (e.g. ENST) use:
         1. seq_type='genomic' to get the primary transcript (pre-mRNA) sequence,
@@ -221,14 +425,14 @@ class REST_API():
         6. seq_type='protein' to get the protein sequence.
         """
         if 'UTR' in seq_type:
-            if Ensb_transcript_ID_preamble in ID:
+            if _is_enst(ID):
                 utrs = self.get_UTRs(ID)
                 return utrs[0] if seq_type == '5UTR' else utrs[1]
-            print(f"{seq_type=} allowed only for transcript ID ({Ensb_transcript_ID_preamble}), but input ID is {ID} !!")
+            _log.warning("seq_type=%r allowed only for transcript ID (%s), but input ID is %s !!", seq_type, Ensb_transcript_ID_preamble, ID)
             return ''
         else:
             ext = f"/sequence/id/{ID}?" if seq_type is None else f"/sequence/id/{ID}?type={seq_type}"
-            return self.endpoint_get_base(ext=ext, headers={"Content-Type": content_type})
+            return self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type), as_bytes=as_bytes)
 
 
     def sequence_region_endpoint_base(self, chromosome_num: str, start_pos: int, end_pos: int, strand: int = 1,
@@ -241,7 +445,7 @@ class REST_API():
         Example for chromosome_num: '1', or 'X'.
         """
         return self.endpoint_get_base(ext=f"/sequence/region/{species}/{chromosome_num.upper()}:{start_pos}..{end_pos}:{strand}?",
-                                      headers={"Content-Type": content_type})
+                                      headers=_content_type_headers(content_type))
 
 
     """
@@ -253,7 +457,7 @@ class REST_API():
         cDNA (i.e. RNA) to genomic coordinate conversion. For example, start=end=1 returns the chromosome coordinate of the first
         bp in the RNA.
         """
-        return self.endpoint_get_base(ext=f"{ext}/{trans_id}/{start}..{end}?", headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext=_MAP_TEMPLATE.format(ext=ext, id=trans_id, s=start, e=end), headers=_content_type_headers(content_type))
 
 
     def CDS2genomic(self, trans_id: str, start: int, end: int, ext: str = "/map/cds", content_type: str = 'application/json') -> dict | str:
@@ -262,7 +466,7 @@ class REST_API():
         For example, start=end=1 returns the chromosome coordinate of the first
         bp in the ORF.
         """
-        return self.endpoint_get_base(ext=f"{ext}/{trans_id}/{start}..{end}?", headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext=_MAP_TEMPLATE.format(ext=ext, id=trans_id, s=start, e=end), headers=_content_type_headers(content_type))
 
 
     def protein2genomic(self, protein_id: str, start: int, end: int, ext: str = "/map/translation", content_type: str = 'application/json') -> dict | str:
@@ -270,7 +474,7 @@ class REST_API():
         Protein (AA sequence) to genomic coordinate conversion. For example, start=end=1 returns the chromosome coordinate of the first
         AA in the protein.
         """
-        return self.endpoint_get_base(ext=f"{ext}/{protein_id}/{start}..{end}?", headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext=_MAP_TEMPLATE.format(ext=ext, id=protein_id, s=start, e=end), headers=_content_type_headers(content_type))
 
 
     def assembly_coordinate_conversions(self,
@@ -278,7 +482,9 @@ class REST_API():
                                         input_assembly: str = 'GRCh37', output_assembly: str = 'GRCh38', strand: int = 1,
                                         content_type: str = 'application/json') -> dict | str:
         """Converts coordinates from input assembly to output assembly."""
-        return self.endpoint_get_base(ext=f"{ext}/{input_assembly}/{chrm}:{start}..{end}:{strand}/{output_assembly}?", headers={"Content-Type" : content_type})
+        ext = _ASSEMBLY_MAP_TEMPLATE.format(ext=ext, input_assembly=input_assembly, chrm=chrm, s=start, e=end,
+                                            strand=strand, output_assembly=output_assembly)
+        return self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type))
 
 
     def symbol2ENSG_id(self, symbol: str, species: str = 'homo_sapiens') -> str:
@@ -323,16 +529,16 @@ class REST_API():
             features = ['gene', 'transcript', 'cds']
 
         feature_str = ';'.join([f"feature={x}" for x in features])
-        return self.endpoint_get_base(ext=f"/overlap/region/{species}/{chrm}:{start}-{end}?{feature_str}", headers={"Content-Type" : content_type})
+        return self.endpoint_get_base(ext=f"/overlap/region/{species}/{chrm}:{start}-{end}?{feature_str}", headers=_content_type_headers(content_type))
 
 
     def protein_overlap_info(self, protein_id: str, feature_type: str = None, feature: str = 'protein_feature', content_type: str = 'application/json') -> dict | str:
         """
         Retrieves feature information that overlaps with a protein.
-        Use type="Smart" to get the protein domains. Use type=None (or omit type when calling the function) to get all the features.
+        Use feature_type="Smart" to get the protein domains. Use feature_type=None (or omit feature_type when calling the function) to get all the features.
         """
-        ext = f"/overlap/translation/{protein_id}?type={feature_type};feature={feature}" if type is not None else f"/overlap/translation/{protein_id}?feature={feature}"
-        return self.endpoint_get_base(ext=ext, headers={"Content-Type" : content_type})
+        ext = f"/overlap/translation/{protein_id}?type={feature_type};feature={feature}" if feature_type is not None else f"/overlap/translation/{protein_id}?feature={feature}"
+        return self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type))
 
     """
     Variation endpoint
@@ -341,7 +547,7 @@ class REST_API():
     def variation_endpoint_base(self, dbSNP: str, species: str = 'human', content_type: str = 'application/json') -> dict | str:
         """Retrieves the chromosome alleles and position of a given dbSNP rs value (e.g., 'rs77924615va')."""
         return self.endpoint_get_base(ext=f"/variation/{species}/{dbSNP}?",
-                                headers={"Content-Type": content_type})
+                                headers=_content_type_headers(content_type))
 
 
     def variation_variant_consequence(self, chrm: str, start: int, end: int, var_allele: str, strand: int = 1,
@@ -353,7 +559,85 @@ class REST_API():
         For DEL, set var_allele to '-'.
         """
         return self.endpoint_get_base(ext=f"/vep/{species}/region/{chrm}:{start}-{end}:{strand}/{var_allele}?",
-                                headers={"Content-Type": content_type})
+                                headers=_content_type_headers(content_type))
+
+
+def _retry_delay(response, retry: int) -> float:
+    """Returns the delay (in seconds) before retrying a request: the response's Retry-After (in seconds), if given, otherwise exponential backoff."""
+    try:
+        return max(0.0, float(response.headers['Retry-After']))
+    except (KeyError, ValueError):
+        return Retry_backoff_factor * 2**retry
+
+
+class AsyncREST_API():
+    """
+    Asynchronous REST API class, for issuing many independent requests concurrently.
+
+    Requires the httpx package with HTTP/2 support (pip install 'httpx[http2]'). Concurrent requests
+    share the HTTP/2 connection(s) of a single httpx.AsyncClient. Use the class as an async context
+    manager (or await aclose()) to release the connections.
+    As in REST_API, requests are rate limited to Ensembl_max_requests_per_second (shared by all tasks using
+    the instance), and transient errors (Retry_status_codes) are retried, honoring Retry-After.
+
+    Example:
+        async with AsyncREST_API() as rapi:
+            info = await rapi.gather_lookup_ids(["ENST00000288135", "ENST00000302278"])
+    """
+    def __init__(self, assembly: str = 'GRCh38', max_connections: int = 20):
+        if httpx is None:
+            raise ImportError("AsyncREST_API requires the httpx package (pip install 'httpx[http2]') !!")
+        try:
+            self.URL = Ensembl_URLs[assembly]
+        except KeyError:
+            _log.error("assembly=%r is not supported (only %s are supported) !!", assembly, ','.join(Ensembl_URLs))
+            raise
+        # the transport retries failed connections; responses with Retry_status_codes are retried by endpoint_get_base
+        transport = httpx.AsyncHTTPTransport(http2=True, retries=Max_retries,
+                                             limits=httpx.Limits(max_connections=max_connections,
+                                                                 max_keepalive_connections=max_connections))
+        self._client = httpx.AsyncClient(base_url=self.URL, transport=transport)
+        # HTTP/2 multiplexes all requests over few connections, so max_connections does not limit the request rate
+        self._bucket = rsut.AsyncTokenBucket(rate=Ensembl_max_requests_per_second, capacity=Ensembl_max_requests_per_second)
+
+    async def aclose(self) -> None:
+        """Closes the underlying client."""
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def endpoint_get_base(self, ext: str = '', params: dict | None = None, headers: dict | None = None) -> dict | str:
+        """Base get endpoint (see rest_api_utils.endpoint_base)."""
+        for retry in range(Max_retries + 1):
+            await self._bucket.consume()
+            r = await self._client.get(ext, params=params, headers=headers)
+            if r.status_code not in Retry_status_codes or retry == Max_retries:
+                break
+            await asyncio.sleep(_retry_delay(r, retry))
+        if not r.is_success:
+            _log.warning("Error in request get: %s %s for url %s", r.status_code, r.reason_phrase, r.url)
+            return {}
+        try:
+            return rsut.json_loads(r.content)
+        except ValueError:
+            return r.text
+
+    async def lookup_id(self, ID: str, options: str = Lookup_options) -> dict | str:
+        """Information about a given ID (see REST_API.lookup_id)."""
+        return await self.endpoint_get_base(ext=f"/lookup/id/{ID}?{options}", headers=_JSON_HEADERS)
+
+    async def gather_lookup_ids(self, ids: list[str], options: str = Lookup_options) -> dict:
+        """Concurrently looks up a list of IDs. Returns a dictionary with keys that are the IDs and values that are the information."""
+        return dict(zip(ids, await asyncio.gather(*(self.lookup_id(x, options=options) for x in ids))))
+
+    async def sequence_endpoint_base(self, ID: str, seq_type: str = None, content_type: str = "text/plain") -> dict | str:
+        """Get a sequence of an ID (see REST_API.sequence_endpoint_base). UTR seq_types are not supported."""
+        ext = f"/sequence/id/{ID}?" if seq_type is None else f"/sequence/id/{ID}?type={seq_type}"
+        return await self.endpoint_get_base(ext=ext, headers=_content_type_headers(content_type))
 
 
 # ==============================================================================================================================
@@ -4,9 +4,26 @@ Utils for REST API.
 
 To support concurrency, consider using the httpx package instead of the requests package.
 """
+from collections import OrderedDict
 from functools import partial
+from typing import Any, Callable
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+
 import requests
 
+try:
+    import orjson  # optional, faster JSON parsing
+    json_loads: Callable = orjson.loads
+except ImportError:
+    json_loads: Callable = json.loads
+
+_log = logging.getLogger(__name__)
+
 # possible request types
 request_types: dict = {
     'get': requests.get,
@@ -17,22 +34,155 @@ def endpoint_base(typ: str, server: str,
                   ext: str = '',
                   params: dict | None = None,
                   headers: dict | None = None,
-                  data: dict | None = None) -> dict | str:
-    """Base endpoint interface."""
+                  data: dict | None = None,
+                  session: requests.Session | None = None,
+                  as_bytes: bool = False) -> dict | str | bytes:
+    """
+    Base endpoint interface.
+    session - if given, the request is sent through this session (reusing its connections), otherwise
+              a new connection is opened per request.
+    as_bytes - if True, the (undecoded) response body is returned as bytes. Use this for large plain-text
+               responses (e.g. sequences) to avoid decoding them into a str.
+    """
     assert typ in request_types, f"{typ=} not supported !!"
 
-    if not (r := request_types[typ](f"{server}{ext}", params=params, headers=headers, data=data)).ok:
+    request = request_types[typ] if session is None else getattr(session, typ)
+    if not (r := request(f"{server}{ext}", params=params, headers=headers, data=data)).ok:
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError as err:
-            print(f"Error in request {request_types[typ].__name__}: {err}")
+            _log.warning("Error in request %s: %s", typ, err)
         return {}
+    if as_bytes:
+        return r.content
     try:
-        return r.json()
-    #except:
-    except (AttributeError,requests.exceptions.JSONDecodeError):
+        return json_loads(r.content)
+    except (AttributeError, ValueError):  # orjson.JSONDecodeError and json.JSONDecodeError are ValueErrors
         return r.text
 
 # base get and post endpoints
 endpoint_get_base = partial(endpoint_base, typ='get')
 endpoint_post_base = partial(endpoint_base, typ='post')
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache (with a dict-like interface) holding up to maxsize items."""
+    def __init__(self, maxsize: int):
+        self.maxsize: int = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Returns the value of key (marking it as recently used), or default if key is not in the cache."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        """Removes all items."""
+        with self._lock:
+            self._data.clear()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    rate - number of tokens added per second.
+    capacity - maximal number of tokens (i.e. the maximal burst size).
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self._tokens: float = capacity
+        self._last: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: float = 1) -> None:
+        """Blocks until the requested number of tokens is available, and consumes them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket rate limiter for asyncio tasks (see TokenBucket).
+
+    rate - number of tokens added per second.
+    capacity - maximal number of tokens (i.e. the maximal burst size).
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self._tokens: float = capacity
+        self._last: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, tokens: float = 1) -> None:
+        """Waits until the requested number of tokens is available, and consumes them (waiting tasks are served in order)."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def cached_endpoint(endpoint: Callable, cache: Any, key_prefix: str, ttl: int) -> Callable:
+    """
+    Wraps an endpoint (e.g. endpoint_get_base with a bound server) with a key-value cache.
+
+    cache - a redis.Redis client, or any object providing get(key) and setex(key, ttl, value).
+    key_prefix - prepended to each key. Should identify the server and the data version, so that
+                 a new data release does not return stale responses.
+    ttl - time to live (in seconds) of a cached response.
+
+    Failed (i.e. empty) responses are not cached. bytes responses (see as_bytes in endpoint_base) are
+    stored as (ASCII) text.
+    """
+    def _cached_endpoint(ext: str = '', params: dict | None = None, headers: dict | None = None, data: dict | None = None,
+                         as_bytes: bool = False) -> dict | str | bytes:
+        request_id = f"{ext}{sorted((params or {}).items())}{sorted((headers or {}).items())}{as_bytes}"
+        key = f"{key_prefix}{hashlib.blake2b(request_id.encode()).hexdigest()}"
+        if (value := cache.get(key)) is not None:
+            value = json_loads(value)
+            return value.encode('ascii') if as_bytes else value
+        if response := endpoint(ext=ext, params=params, headers=headers, data=data, as_bytes=as_bytes):
+            cache.setex(key, ttl, json.dumps(response.decode('ascii') if as_bytes else response))
+        return response
+    return _cached_endpoint
+
+
+def rate_limited_endpoint(endpoint: Callable, bucket: TokenBucket) -> Callable:
+    """Wraps an endpoint so that each request first consumes a token from bucket (shared by all threads)."""
+    def _rate_limited_endpoint(**kwargs) -> dict | str | bytes:
+        bucket.consume()
+        return endpoint(**kwargs)
+    return _rate_limited_endpoint
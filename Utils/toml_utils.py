@@ -18,69 +18,11 @@ def print_nested_dicts(data: Any, num_identation: int = 0, identation_type: str
     else:
         print(f" = {data}")
 
-class myToml_read:
-    """
-    Reading and displaying TOML file, using the (built-in) python tomllib package.
-
-    Use this if the package toml is not installed, otherwise, use the myToml class.
-    """
-    __data: dict = {}
-
-    def load(self, filename: pathlib.Path) -> dict:
-        """Reads TOML file."""
-        try:
-            with open(filename, 'rb') as fp:
-                self.__data = tomllib.load(fp)
-        except FileNotFoundError:
-            print(f"Cannot find {filename} !!")
-        return self.__data
-
-    def show(self) -> None:
-        """print the data"""
-        print_nested_dicts(self.__data)
-
-    def get_data(self) -> dict:
-        return self.__data
-
-    def __repr__(self):
-        return "myToml())"
-
-    def __str__(self):
-        return "Reading and displaying TOML file.\n"
-
-class myToml:
-    """
-    Reading, writing, and displaying TOML files.
-
-    Requires the package toml (pip install toml)
-    """
-    import toml
-
-    __data: dict = {}  # holds the recent TOML data
-
-    def load(self, filename: pathlib.Path) -> dict:
-        """Reads TOML file."""
-        try:
-            with open(filename, 'r') as fp:
-                self.__data = self.toml.load(fp)
-        except FileNotFoundError:
-            print(f"Cannot find {filename} !!")
-        return self.__data
-        
-    def dump(self, data: dict, filename: pathlib.Path) -> None:
-        """Writes data to a TOML file"""
-        with open(filename, 'w') as fp:
-            self.toml.dump(data, fp)
-
-    def get_data(self) -> dict:
-        return self.__data
-
-    def show(self):
-        """prints the data with """
-        print_nested_dicts(self.__data)
-
-    def __repr__(self):
-        return "myToml())"
-
-    def __str__(self):
-        return "Reading, writing, and displaying TOML file.\n"
\ No newline at end of file
+def load_toml(filename: pathlib.Path) -> dict:
+    """Reads TOML file, using the (built-in) python tomllib package."""
+    try:
+        with open(filename, 'rb') as fp:
+            return tomllib.load(fp)
+    except FileNotFoundError:
+        print(f"Cannot find {filename} !!")
+    return {}
@@ -2,19 +2,36 @@
 """
 Utils for main.py.
 """
+import json
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
+from functools import partial, reduce
+from typing import Callable, Iterable, Iterator
 
-#from typing import Callable
+import numpy as np
 import pandas as pd
 
+import Utils.cache_utils as cchu
 import Utils.ensembl_rest_utils as erut  # in my Utils/ folder
 import Utils.toml_utils as tmut
 import Utils.uniprot_utils as uput  # in my Utils/ folder
 
+# copy-on-write avoids copying dataframes when adding columns (always enabled, and the option deprecated, with pandas >= 3)
+if int(pd.__version__.split('.', maxsplit=1)[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 # configuration Toml file
 Cnfg_Toml_file: pathlib.Path = pathlib.Path('./config/config.toml')
 
+# maximal number of concurrent UniProt requests when retrieving UniProt IDs and domains (the Ensembl IDs
+# are retrieved with bulk lookups, so this is not bounded by the REST_API pool_maxsize)
+Max_workers: int = 16
+
+# header format of the Excel output (as the default header format of pandas < 3.0)
+Excel_header_format: dict = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
 class ConfigurationError(Exception):
     """Invalid configuration exception."""
     def __init__(self, message: str):
@@ -35,6 +52,15 @@ class Labels:
     UniProt_URL: str = 'UniProt_URL'
     Domains: str = 'Domains'
 
+# optional ID columns (in output order), and their ['IDs'] configuration flags
+ID_columns_plan: list[tuple[str,str]] = [
+    (Labels.UniProt_ID, 'show_uniprot_id'),
+    (Labels.Gene_ID, 'show_gene_id'),
+    (Labels.Gene_name, 'show_gene_name'),
+    (Labels.Protein_ID, 'show_protein_id'),
+    (Labels.UniProt_URL, 'show_uniprot_url')
+]
+
 # update Uniprot_url_template based on uniprot_id
 #get_uniprot_url: Callable[[str], str] = lambda uniprot_id: f"https://www.uniprot.org/uniprotkb/{uniprot_id}/entry"
 def get_uniprot_url(uniprot_id: str) -> str:
@@ -45,26 +71,37 @@ def check_configuration(cnfg_data: dict) -> None:
     """Check configuration validity."""
     assert cnfg_data['Assembly']['version'] in ["GRCh37", "GRCh38"], f"Aeembly version {cnfg_data['Assembly']['version']} not supported !!"
     assert cnfg_data['Output']['format'] in ["basic", "compact", "expanded"], f"Output format {cnfg_data['Output']['format']} not supported !!"
-    if not pathlib.Path(cnfg_data['Transcript']['file']).is_file():
-        raise FileNotFoundError(f"Cannot find input transcript file {cnfg_data['Transcript']['file']} !!")
+    transcript_path = pathlib.Path(cnfg_data['Transcript']['file'])
+    output_suffix = pathlib.Path(cnfg_data['Output']['file']).suffix
+    if not transcript_path.is_file():
+        raise FileNotFoundError(f"Cannot find input transcript file {transcript_path} !!")
     if not isinstance(cnfg_data['Domains']['uniprot_features'], list):
         raise TypeError(f"Domain:features in {Cnfg_Toml_file} must contain a list of UniProt domains !!")
-    if (pathlib.Path(cnfg_data['Output']['file']).suffix == '.csv') and (cnfg_data['Output']['format'] == 'expanded'):
+    if (output_suffix == '.csv') and (cnfg_data['Output']['format'] == 'expanded'):
         raise ConfigurationError("CSV output file not supported for 'expanded' output format !!")
-    if pathlib.Path(cnfg_data['Output']['file']).suffix not in ['.xlsx', '.xls', '.csv']:
+    if output_suffix not in ['.xlsx', '.xls', '.csv']:
         raise ConfigurationError(f"Output file {cnfg_data['Output']['file']} not supported (only excel and CSV are supported) !!")
+    if (cache_cnfg := cnfg_data.get('Cache')) is not None:  # optional section (caching is disabled if missing)
+        if not isinstance(cache_cnfg.get('enable', False), bool):
+            raise TypeError(f"Cache:enable in {Cnfg_Toml_file} must be true or false !!")
+        if cache_cnfg.get('enable', False) and \
+           not (isinstance(cache_cnfg.get('file'), str) and isinstance(cache_cnfg.get('ttl_days'), int | float)):
+            raise TypeError(f"Cache:file and Cache:ttl_days in {Cnfg_Toml_file} must be a string and a number !!")
 
 
 def load_config() -> dict:
     """Loads the Toml configuration file."""
-    cnfg_data = tmut.myToml().load(Cnfg_Toml_file)
+    cnfg_data = tmut.load_toml(Cnfg_Toml_file)
     # verify configuration validity
     check_configuration(cnfg_data)
+    # parsed paths (keys starting with '_' are derived from the configuration, and are not part of the Toml file)
+    cnfg_data['_transcript_path'] = pathlib.Path(cnfg_data['Transcript']['file'])
+    cnfg_data['_output_path'] = pathlib.Path(cnfg_data['Output']['file'])
     return cnfg_data
 
 def print_config(cnfg_data: dict) -> None:
     """Pretty print of config data."""
-    tmut.print_nested_dicts(cnfg_data)
+    tmut.print_nested_dicts({k: v for k, v in cnfg_data.items() if not k.startswith('_')})
 
 # this function was taken from myutils.py
 def dfs_to_excel_file(dfs: list[pd.DataFrame], excel_file_name: str, sheet_names: list[str],
@@ -79,21 +116,27 @@ def dfs_to_excel_file(dfs: list[pd.DataFrame], excel_file_name: str, sheet_names
     if len(dfs) != len(sheet_names):
         raise ValueError("dfs_to_excel_file: the numbers of dfs and sheet names must match !!")
 
-    with pd.ExcelWriter(excel_file_name) as writer:
+    # constant_memory flushes each row to disk once the next row is written, so memory does not grow with
+    # the number of rows. Rows must therefore be written in order (df.to_excel writes column by column, which
+    # would lose data), so the data is written here row by row, after the column widths are set.
+    with pd.ExcelWriter(excel_file_name, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        h_format = writer.book.add_format(Excel_header_format if header_format is None else header_format)
         for sheet_name, df in zip(sheet_names, dfs):
-            df.to_excel(writer, sheet_name=sheet_name, index=add_index, na_rep=na_rep, float_format=float_format)
+            if add_index:
+                df = df.reset_index(names=df.index.name or '')
+            worksheet = writer.book.add_worksheet(sheet_name)
 
             # Auto-adjust columns' width
-            worksheet = writer.sheets[sheet_name]
-            for column in df.columns:
-                column_width = max(df[df[column].notna()][column].astype(str).map(len).max(), len(column)) + extra_width  # this first removes NA values from the column
-                col_idx = df.columns.get_loc(column)
+            data_widths = df.astype('string').apply(lambda col: col.str.len().max()).fillna(0).to_numpy(dtype=int)  # NA values are ignored
+            column_widths = np.maximum(data_widths, [len(column) for column in df.columns]) + extra_width
+            for col_idx, column_width in enumerate(column_widths):
                 worksheet.set_column(col_idx, col_idx, column_width)
 
-            if header_format is not None:
-                h_format = writer.book.add_format(header_format)
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, h_format)
+            if float_format is not None:
+                df = df.assign(**{col: df[col].map(lambda x: float(float_format % x), na_action='ignore') for col in df.select_dtypes('float').columns})
+            worksheet.write_row(0, 0, df.columns, h_format)
+            for row_num, row in enumerate(df.astype(object).where(df.notna(), na_rep).itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row_num, 0, row)
 
 # def load_transcripts(cnfg_data) -> list[str]:
 #     """
@@ -107,11 +150,11 @@ def dfs_to_excel_file(dfs: list[pd.DataFrame], excel_file_name: str, sheet_names
 #     raise ValueError(f"Input file {file} format not supported !!")
 
 
-def load_transcripts(cnfg_data: dict) -> list[str]:
+def load_transcripts(cnfg_data: dict) -> Iterable[str]:
     """
     Loading transcripts from input file.
     """
-    match (file := pathlib.Path(cnfg_data['Transcript']['file'])).suffix:
+    match (file := cnfg_data['_transcript_path']).suffix:
         case ".txt":
             return load_transcripts_text(cnfg_data)
         case ".csv":
@@ -124,109 +167,174 @@ def load_transcripts_csv(cnfg_data: dict) -> list[str]:
     Loading transcript IDs from the input csv file and returning the transcript IDs.
     """
     try:
-        return pd.read_csv(cnfg_data['Transcript']['file'], sep=cnfg_data['Transcript']['csv_sep'])[cnfg_data['Transcript']['csv_file_transcript_col_name']].unique().tolist()
-    except (FileNotFoundError, KeyError) as e:
-        print(f"Error in loading transcripts from the column {cnfg_data['Transcript']['csv_file_transcript_col_name']} in {cnfg_data['Transcript']['file']} file: {e}")
+        col = cnfg_data['Transcript']['csv_file_transcript_col_name']
+        # only the transcripts column is parsed (usecols), as strings (no type inference)
+        return pd.read_csv(cnfg_data['_transcript_path'], sep=cnfg_data['Transcript']['csv_sep'], usecols=[col], dtype='string')[col].drop_duplicates().tolist()
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        print(f"Error in loading transcripts from the column {cnfg_data['Transcript']['csv_file_transcript_col_name']} in {cnfg_data['_transcript_path']} file: {e}")
         raise
 
-def load_transcripts_text(cnfg_data: dict) -> list[str]:
-    """Loading transcript IDs from the input text file and returning the transcript IDs."""
+def load_transcripts_text(cnfg_data: dict) -> Iterator[str]:
+    """Loading transcript IDs from the input text file and yielding the transcript IDs (one line at a time)."""
     try:
-        with open(cnfg_data['Transcript']['file'], 'rt', encoding='UTF-8') as fp:
-            return [x for x in [line.rstrip() for line in fp] if 'ENST' in x]
+        with open(cnfg_data['_transcript_path'], 'rt', encoding='UTF-8') as fp:
+            for line in fp:
+                if 'ENST' in (transcript := line.rstrip()):
+                    yield transcript
     except FileNotFoundError:
-        print(f"Can not find input transcripts file {cnfg_data['Transcript']['file']}. Please check configuration file, under ['Transcript']['file'] !!")
+        print(f"Can not find input transcripts file {cnfg_data['_transcript_path']}. Please check configuration file, under ['Transcript']['file'] !!")
         raise
 
+def _open_cache(cnfg_data: dict) -> cchu.DiskCache | nullcontext:
+    """Opens the persistent cache (a context manager yielding None if caching is disabled in the configuration)."""
+    if not (cache_cnfg := cnfg_data.get('Cache', {})).get('enable', False):
+        return nullcontext()
+    return cchu.DiskCache(cache_cnfg['file'], ttl=int(cache_cnfg['ttl_days'] * 86400))
+
+def _cached_bulk(cache: cchu.DiskCache | None, key_prefix: str, keys: list[str], fetch: Callable[[list[str]], dict]) -> dict:
+    """
+    Returns a dictionary with the values of keys.
+    Values that are not in the cache (all values if cache is None) are retrieved with fetch(missing_keys), which returns
+    a dictionary, and are stored (as JSON) in the cache under f"{key_prefix}:{key}". Empty values are not stored.
+    """
+    if cache is None:
+        return fetch(keys)
+    values: dict = {}
+    for key in keys:
+        if (value := cache.get(f"{key_prefix}:{key}")) is not None:
+            values[key] = json.loads(value)
+    if missing := [key for key in dict.fromkeys(keys) if key not in values]:
+        fetched = fetch(missing)
+        for key, value in fetched.items():
+            if value:
+                cache.set(f"{key_prefix}:{key}", json.dumps(value))
+        values |= fetched
+    return values
+
+def _lookup_transcripts_IDs(rapi: erut.REST_API, transcripts: list[str]) -> dict[str,dict[str,str]]:
+    """Returns the parent gene ID and protein ID of each transcript (an empty dictionary if the transcript was not found)."""
+    transcripts_info: dict = rapi.lookup_ids_bulk(transcripts, options='expand=1')  # expand=1 includes the Translation
+    return {
+        transcript: {
+            Labels.Gene_ID: info.get('Parent', ''),
+            Labels.Protein_ID: info['Translation']['id'] if 'Translation' in info else ''
+        } if (info := transcripts_info.get(transcript)) else {}
+        for transcript in transcripts
+    }
+
+def _lookup_genes_names(rapi: erut.REST_API, genes: list[str]) -> dict[str,str]:
+    """Returns the name (i.e. symbol) of each gene ID (an empty string if the gene was not found)."""
+    genes_info: dict = rapi.lookup_ids_bulk(genes, options='expand=0')
+    return {gene: (genes_info.get(gene) or {}).get('display_name', '') for gene in genes}
+
 def get_transcripts_IDs(cnfg_data: dict, transcripts: list[str]) -> dict[str,dict[str,str]]:
     """
     Retreives different IDs of a transcript.
+    The Ensembl IDs of all transcripts (and the names of their genes) are retrieved with bulk lookups, and the
+    UniProt IDs are retrieved concurrently (up to Max_workers at a time).
+    Retrieved IDs are stored in (and reused from) the persistent cache, if enabled.
     """
-    rapi = erut.REST_API(cnfg_data['Assembly']['version'])
+    assembly = cnfg_data['Assembly']['version']
+    show_protein_id, show_gene_id, show_gene_name, show_uniprot_url = (
+        cnfg_data['IDs'][flag] for flag in ['show_protein_id', 'show_gene_id', 'show_gene_name', 'show_uniprot_url']
+    )
+    with (_open_cache(cnfg_data) as cache, erut.REST_API(assembly) as rapi,
+          ThreadPoolExecutor(max_workers=Max_workers) as executor):
+        # the Ensembl lookups are needed only for the Ensembl IDs (and gene names) shown in the output
+        transcripts_info: dict = {}
+        if show_protein_id or show_gene_id or show_gene_name:
+            transcripts_info = _cached_bulk(cache, f"{assembly}:transcript_ids", transcripts, partial(_lookup_transcripts_IDs, rapi))
+        genes_names: dict = {}
+        if show_gene_name:
+            genes = list({x[Labels.Gene_ID] for x in transcripts_info.values() if x and x[Labels.Gene_ID]})
+            genes_names = _cached_bulk(cache, f"{assembly}:gene_name", genes, partial(_lookup_genes_names, rapi))
+        # the UniProt IDs are always needed (the domains are retrieved by UniProt ID)
+        uniprot_ids = _cached_bulk(cache, f"{assembly}:uniprot_id", transcripts,
+                                   lambda ids: dict(zip(ids, executor.map(uput.ensembl_id2uniprot_id, ids))))
+
     info: dict = {}
     for transcript in transcripts:
-        # Gene ID and name
-        if cnfg_data['IDs']['show_gene_name'] or cnfg_data['IDs']['show_gene_id']:
-            ensg_id = rapi.get_transcript_parent(transcript)
-            if cnfg_data['IDs']['show_gene_name'] :
-                ensg_name = '' if ensg_id == '' else rapi.ENSG_id2symbol(ensg_id)
-
-        uniprot_id = uput.ensembl_id2uniprot_id(transcript)
+        transcript_info = transcripts_info.get(transcript) or {}
+        ensg_id = transcript_info.get(Labels.Gene_ID, '')
+        uniprot_id = uniprot_ids[transcript]
         info[transcript] = {
-            Labels.Protein_ID: rapi.transcript_id2protein_id(transcript) if cnfg_data['IDs']['show_protein_id'] else '',
-            Labels.Gene_ID: ensg_id if cnfg_data['IDs']['show_gene_id'] else '',
-            Labels.Gene_name: ensg_name if cnfg_data['IDs']['show_gene_name'] else '',
+            Labels.Protein_ID: transcript_info.get(Labels.Protein_ID, '') if show_protein_id else '',
+            Labels.Gene_ID: ensg_id if show_gene_id else '',
+            Labels.Gene_name: genes_names.get(ensg_id, '') if show_gene_name else '',
             Labels.UniProt_ID: uniprot_id,
-            Labels.UniProt_URL: get_uniprot_url(uniprot_id) if cnfg_data['IDs']['show_uniprot_url'] else ''
+            Labels.UniProt_URL: get_uniprot_url(uniprot_id) if show_uniprot_url else ''
         }
     return info
 
+def _retrieve_domains_records(features: list, uniprot_id: str) -> list[dict]:
+    """Returns the UniProt domains (of the types in features) of a UniProt ID, as a list of records."""
+    return uput.retrieve_protein_data_features_subset(uniprot_id, features).to_dict(orient='records')
+
 def get_uniprot_domains(cnfg_data: dict, transcripts_ids: dict[str,dict[str,str]]) -> dict[str,dict]:
-    """Get UniProt domains given the UniProt ID."""
-    info: dict = {}
+    """
+    Get UniProt domains given the UniProt ID.
+    The UniProt IDs are processed concurrently (up to Max_workers at a time).
+    Retrieved domains are stored in (and reused from) the persistent cache, if enabled.
+    """
     features: list = cnfg_data['Domains']['uniprot_features']
+    uniprot_ids = list({x[Labels.UniProt_ID] for x in transcripts_ids.values()})
+    with _open_cache(cnfg_data) as cache, ThreadPoolExecutor(max_workers=Max_workers) as executor:
+        domains = _cached_bulk(cache, f"uniprot_features:{','.join(features)}", uniprot_ids,
+                               lambda ids: dict(zip(ids, executor.map(partial(_retrieve_domains_records, features), ids))))
+
+    info: dict = {}
     for transcript, transcript_ids in transcripts_ids.items():
-        if (df_uniprot := uput.retrieve_protein_data_features_subset(transcript_ids[Labels.UniProt_ID], features)).empty:
+        if (df_uniprot := pd.DataFrame.from_records(domains[transcript_ids[Labels.UniProt_ID]])).empty:
             print(f"\n[** No {features} UniProt features were found for {transcript} (UniProt ID={transcript_ids[Labels.UniProt_ID]}) **]\n")
             # we do not use continue so that the domains for this transcript will be empty in the output file
         info[transcript] = {
             'domains_df': df_uniprot,  # in a dataframe format
-            'domains_list': list(df_uniprot.T.to_dict().values())  # in a list of domains format
         } | transcript_ids
     return info
 
-def _append_optional_IDs_to_df(cnfg_data: dict, df: pd.DataFrame, start_index: int, ids_dict: dict) -> pd.DataFrame:
-    """Append optional ID columns based on configuration to inut dataframe."""
-    dfc = df.copy()
-    if cnfg_data['IDs']['show_uniprot_id']:
-        dfc.insert(start_index, Labels.UniProt_ID, ids_dict[Labels.UniProt_ID])
-        start_index += 1
-    if cnfg_data['IDs']['show_gene_id']:
-        dfc.insert(start_index, Labels.Gene_ID, ids_dict[Labels.Gene_ID])
-        start_index += 1
-    if cnfg_data['IDs']['show_gene_name']:
-        dfc.insert(start_index, Labels.Gene_name, ids_dict[Labels.Gene_name])
-        start_index += 1
-    if cnfg_data['IDs']['show_protein_id']:
-        dfc.insert(start_index, Labels.Protein_ID, ids_dict[Labels.Protein_ID])
-        start_index += 1
-    if cnfg_data['IDs']['show_uniprot_url']:
-        dfc.insert(start_index, Labels.UniProt_URL, ids_dict[Labels.UniProt_URL])
-    return dfc
-
-def _gen_basic_domain_dataframe(cnfg_data: dict, transcripts_domains: dict[str,dict]) -> pd.DataFrame:
+def _optional_ID_columns(cnfg_data: dict) -> list[str]:
+    """Returns the (ordered) optional ID columns enabled in the configuration."""
+    return [label for label, flag in ID_columns_plan if cnfg_data['IDs'][flag]]
+
+def _gen_basic_domain_dataframe(id_cols: list[str], transcripts_domains: dict[str,dict]) -> pd.DataFrame:
     """Generate a dataframe with all transcripts, where each domain is listed in a separate row."""
-    all_dfs: list = []
-    for k, v in transcripts_domains.items():
-        df: pd.DataFrame = v['domains_df'].copy()
-        df.insert(0, Labels.Transcript_ID, k)
-        df = _append_optional_IDs_to_df(cnfg_data, df, 1, v)
-        all_dfs.append(df)
-    return pd.concat(all_dfs).reset_index(drop=True)
-
-def _gen_compact_domain_dataframe(cnfg_data: dict, transcripts_domains: dict[str,dict]) -> pd.DataFrame:
+    # all domains (with their transcript ID) in one dataframe
+    domains_df = pd.concat([v['domains_df'].assign(**{Labels.Transcript_ID: k}) for k, v in transcripts_domains.items()], ignore_index=True)
+    domain_cols = [x for x in domains_df.columns if x != Labels.Transcript_ID]
+
+    # the optional IDs of each transcript, added with a single merge
+    ids_df = pd.DataFrame.from_records([{Labels.Transcript_ID: k} | {col: v[col] for col in id_cols} for k, v in transcripts_domains.items()],
+                                       columns=[Labels.Transcript_ID, *id_cols])
+    return domains_df.merge(ids_df, on=Labels.Transcript_ID, how='left')[[Labels.Transcript_ID, *id_cols, *domain_cols]]
+
+def _domains_to_string(df: pd.DataFrame) -> str:
+    """Returns the domains of a domains dataframe as a single string (domains separated by '|', each domain as a comma separated list of column:value)."""
+    if df.empty:
+        return ''
+    # str of each value (as object, so missing values become 'nan'/'None' as in an f-string), prefixed by its column name
+    cols = [np.char.add(f"{col}:", df[col].to_numpy(dtype=object).astype(str)) for col in df.columns]
+    return '|'.join(reduce(lambda x, y: np.char.add(np.char.add(x, ','), y), cols))
+
+def _gen_compact_domain_dataframe(id_cols: list[str], transcripts_domains: dict[str,dict]) -> pd.DataFrame:
     """Generate a dataframe with all transcripts, where all domains of a transcript are aggregate into a single row."""
-    all_dfs: list = []
-    for k, v in transcripts_domains.items():
-        df = pd.DataFrame({
-            Labels.Transcript_ID: k,
-        }, index=[0])
-        df = _append_optional_IDs_to_df(cnfg_data, df, 1, v)
-        df[Labels.Domains] = "|".join([",".join([f"{k}:{v}" for k, v in x.items()]) for x in v['domains_list']])
-        all_dfs.append(df)
-    return pd.concat(all_dfs).reset_index(drop=True)
+    # one record per transcript, converted to a dataframe at once
+    return pd.DataFrame.from_records(
+        [{Labels.Transcript_ID: k} | {col: v[col] for col in id_cols} | {Labels.Domains: _domains_to_string(v['domains_df'])} for k, v in transcripts_domains.items()],
+        columns=[Labels.Transcript_ID, *id_cols, Labels.Domains]
+    )
 
 def generate_output_table(cnfg_data: dict, transcripts_domains: dict[str,dict]) -> tuple[list[pd.DataFrame],list[str]]:
     """Returns the output dataframe containing IDs and domains."""
+    id_cols = _optional_ID_columns(cnfg_data)
     match cnfg_data['Output']['format']:
         case 'basic':
-            dfs = [_gen_basic_domain_dataframe(cnfg_data, transcripts_domains)]
+            dfs = [_gen_basic_domain_dataframe(id_cols, transcripts_domains)]
             transcript_ids = [Labels.Domains]  # when all transcripts are in the same sheet, we simply call the sheet Labels.Domains]
         case 'compact':
-            dfs = [_gen_compact_domain_dataframe(cnfg_data, transcripts_domains)]
+            dfs = [_gen_compact_domain_dataframe(id_cols, transcripts_domains)]
             transcript_ids = [Labels.Domains]  # when all transcripts are in the same sheet, we simply call the sheet Labels.Domains]
         case 'expanded':
-            df = _gen_basic_domain_dataframe(cnfg_data, transcripts_domains)
+            df = _gen_basic_domain_dataframe(id_cols, transcripts_domains)
             transcript_ids, dfs = zip(*list(df.groupby(by=Labels.Transcript_ID)))  # sheet name is the transcript ID
             dfs = [dfx.drop(columns=[Labels.Transcript_ID]) for dfx in dfs]  # remove transcript ID columns, since it is the sheet name
         case _:
@@ -236,10 +344,10 @@ def generate_output_table(cnfg_data: dict, transcripts_domains: dict[str,dict])
 def generate_output_file(cnfg_data: dict, transcripts_domains: dict[str,dict]) -> None:
     """Generates the ouput file containing the IDs and domains"""
     dfs, sheet_names = generate_output_table(cnfg_data, transcripts_domains)
-    match pathlib.Path(cnfg_data['Output']['file']).suffix:
+    match (output_path := cnfg_data['_output_path']).suffix:
         case '.csv':
-            dfs[0].to_csv(cnfg_data['Output']['file'], sep=',', index=False)
+            dfs[0].to_csv(output_path, sep=',', index=False)
         case '.xlsx' | '.xls':
-            dfs_to_excel_file(dfs, cnfg_data['Output']['file'], sheet_names=sheet_names, add_index=False, extra_width=2)
+            dfs_to_excel_file(dfs, output_path, sheet_names=sheet_names, add_index=False, extra_width=2)
         case _:
-            raise ConfigurationError(f"Output file {cnfg_data['Output']['file']} not supported (only excel and CSV are supported) !!")
+            raise ConfigurationError(f"Output file {output_path} not supported (only excel and CSV are supported) !!")
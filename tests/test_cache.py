@@ -0,0 +1,67 @@
+"""
+Activate environment and run "pytest".
+"""
+import time
+
+import Utils.cache_utils as cchu
+import Utils.utils as u
+
+
+def test_disk_cache_get_setex(tmp_path) -> None:
+    with cchu.DiskCache(tmp_path / 'cache' / 'test.sqlite', ttl=60) as cache:
+        assert cache.get('a') is None
+        cache.setex('a', 60, '{"x": 1}')
+        cache.set('b', 'text')
+        assert cache.get('a') == '{"x": 1}'
+        assert cache.get('b') == 'text'
+        cache.set('a', 'new')
+        assert cache.get('a') == 'new'
+
+    # the cache persists between instances
+    with cchu.DiskCache(tmp_path / 'cache' / 'test.sqlite', ttl=60) as cache:
+        assert cache.get('a') == 'new'
+
+
+def test_disk_cache_ttl_expiry(tmp_path) -> None:
+    with cchu.DiskCache(tmp_path / 'test.sqlite', ttl=60) as cache:
+        cache.setex('short', 0.05, 'value')
+        cache.setex('long', 60, 'value')
+        time.sleep(0.1)
+        assert cache.get('short') is None
+        assert cache.get('long') == 'value'
+
+
+def test_cached_bulk_fetches_missing_keys(tmp_path) -> None:
+    fetched: list[list[str]] = []
+
+    def fetch(keys: list[str]) -> dict:
+        fetched.append(keys)
+        return {key: ({'id': key.upper()} if key != 'missing' else {}) for key in keys}
+
+    with cchu.DiskCache(tmp_path / 'test.sqlite', ttl=60) as cache:
+        assert u._cached_bulk(cache, 'p', ['a', 'b', 'missing'], fetch) == \
+            {'a': {'id': 'A'}, 'b': {'id': 'B'}, 'missing': {}}
+        assert fetched == [['a', 'b', 'missing']]
+        assert cache.get('p:a') is not None
+        assert cache.get('p:missing') is None, "Empty values must not be cached"
+
+        # only the keys not in the cache (including the previously empty one) are fetched
+        assert u._cached_bulk(cache, 'p', ['a', 'c', 'b', 'missing'], fetch) == \
+            {'a': {'id': 'A'}, 'b': {'id': 'B'}, 'c': {'id': 'C'}, 'missing': {}}
+        assert fetched[1] == ['c', 'missing']
+
+        # nothing is fetched when all keys are cached
+        u._cached_bulk(cache, 'p', ['a', 'c'], fetch)
+        assert len(fetched) == 2
+
+    # without a cache, all keys are fetched
+    assert u._cached_bulk(None, 'p', ['a'], fetch) == {'a': {'id': 'A'}}
+    assert fetched[2] == ['a']
+
+
+def test_open_cache_disabled_without_cache_section(tmp_path) -> None:
+    with u._open_cache({}) as cache:
+        assert cache is None
+    cnfg_data = {'Cache': {'enable': True, 'file': str(tmp_path / 'test.sqlite'), 'ttl_days': 1}}
+    with u._open_cache(cnfg_data) as cache:
+        assert isinstance(cache, cchu.DiskCache)
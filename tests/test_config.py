@@ -38,7 +38,8 @@ def test_config_is_valid() -> None:
         cnfg_data['IDs']['show_gene_name'],
         cnfg_data['IDs']['show_protein_id'],
         cnfg_data['IDs']['show_uniprot_id'],
-        cnfg_data['IDs']['show_uniprot_url']
+        cnfg_data['IDs']['show_uniprot_url'],
+        cnfg_data['Cache']['enable']
     ]
     assert all(isinstance(x, bool) for x in bool_types), \
         "All boolean values must be of type bool !!"
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Activate environment and run "pytest".
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+import Utils.ensembl_rest_utils as erut
+import Utils.rest_api_utils as rsut
+
+MET_info: dict = {
+    'id': 'ENSG00000105976',
+    'display_name': 'MET',
+    'strand': 1,
+    'canonical_transcript': 'ENST00000397752.8',
+    'Transcript': [
+        {'id': 'ENST00000397752', 'start': 116672196, 'end': 116798377, 'strand': 1, 'length': 6641,
+         'biotype': 'protein_coding', 'version': 8, 'Translation': {'id': 'ENSP00000380860', 'length': 1390}},
+        {'id': 'ENST00000495962', 'start': 116771956, 'end': 116774773, 'strand': 1, 'length': 720,
+         'biotype': 'retained_intron', 'version': 1}
+    ]
+}
+
+
+class FakeResponse:
+    """A (successful) requests.Response holding a JSON body."""
+    ok: bool = True
+
+    def __init__(self, data: dict):
+        self.content: bytes = json.dumps(data).encode()
+        self.text: str = self.content.decode()
+
+
+class FakeCache(dict):
+    """A dict-backed cache (the redis.Redis get and setex subset used by rest_api_utils.cached_endpoint)."""
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        self[key] = value
+
+
+def test_cached_endpoint() -> None:
+    calls: list[tuple] = []
+    responses: dict = {'/ok': {'id': 'ENSG1'}, '/seq': b'MKT', '/fail': {}}
+
+    def endpoint(ext: str = '', params=None, headers=None, data=None, as_bytes: bool = False) -> dict | bytes:
+        calls.append((ext, params, headers, as_bytes))
+        return responses[ext]
+
+    cache = FakeCache()
+    cached = rsut.cached_endpoint(endpoint, cache, key_prefix='test:', ttl=60)
+
+    # a response is cached under a key starting with key_prefix
+    # (the key depends on params, headers and as_bytes)
+    assert cached(ext='/ok', params={'a': 1}) == {'id': 'ENSG1'}
+    assert cached(ext='/ok', params={'a': 1}) == {'id': 'ENSG1'}
+    assert len(calls) == 1 and len(cache) == 1 and next(iter(cache)).startswith('test:')
+    cached(ext='/ok', params={'a': 2})
+    cached(ext='/ok', params={'a': 1}, headers={'Content-Type': 'application/json'})
+    assert len(calls) == 3 and len(cache) == 3
+
+    # bytes responses are stored as text, and returned as bytes
+    assert cached(ext='/seq', as_bytes=True) == b'MKT'
+    assert cached(ext='/seq', as_bytes=True) == b'MKT'
+    assert len(calls) == 4 and len(cache) == 4
+
+    # failed (empty) responses are not cached
+    assert not cached(ext='/fail')
+    assert not cached(ext='/fail')
+    assert len(calls) == 6 and len(cache) == 4
+
+
+def test_rest_api_cache_key_includes_release(monkeypatch) -> None:
+    monkeypatch.setattr(erut.REST_API, 'get_release_info', lambda self, **kwargs: {'releases': [113]})
+    cache = FakeCache()
+    with erut.REST_API('GRCh38', cache=cache) as rapi:
+        rapi._session.get = lambda url, **kwargs: FakeResponse(MET_info)  # pylint: disable=protected-access
+        rapi.lookup_id('ENSG00000105976')
+    assert len(cache) == 1 and next(iter(cache)).startswith(f"ensembl:113:{rapi.URL}:")
+
+
+def test_symbol_lookup_seeds_lookup_id() -> None:
+    urls: list[str] = []
+
+    def fake_get(url: str, **kwargs) -> FakeResponse:
+        urls.append(url)
+        return FakeResponse(MET_info)
+
+    with erut.REST_API('GRCh38') as rapi:
+        rapi._session.get = fake_get  # pylint: disable=protected-access
+
+        assert rapi.get_transcripts_sizes_of_gene('MET') == \
+            {'ENST00000397752': (6641, 1390), 'ENST00000495962': (720, -1)}
+        assert len(urls) == 1 and '/lookup/symbol/homo_sapiens/MET' in urls[0]
+
+        # the gene and its transcripts are memoized by the symbol lookup
+        assert rapi.get_transcript_sizes('ENST00000397752') == (6641, 1390)
+        assert rapi.get_transcript_version('ENST00000495962') == 1
+        assert rapi.get_gene_strand('ENSG00000105976') == 1
+        assert rapi.get_gene_strand('MET') == 1
+        assert len(urls) == 1, f"Expected a single request, got {urls}"
+
+
+def test_lookup_symbol_default_options() -> None:
+    urls: list[str] = []
+    with erut.REST_API('GRCh38') as rapi:
+        rapi._session.get = lambda url, **kwargs: urls.append(url) or FakeResponse(MET_info)  # pylint: disable=protected-access
+        rapi.lookup_symbol('MET')
+    assert len(urls) == 1 and urls[0].endswith('/lookup/symbol/homo_sapiens/MET?expand=1')
+
+
+def test_protein_overlap_info_feature_type() -> None:
+    exts: list[str] = []
+    rapi = erut.REST_API('GRCh38')
+    rapi.endpoint_get_base = lambda ext='', **kwargs: exts.append(ext) or {}
+
+    # without feature_type, the type parameter must not be sent (previously sent as type=None)
+    rapi.protein_overlap_info('ENSP00000380860')
+    rapi.protein_overlap_info('ENSP00000380860', feature_type='Smart')
+    assert exts == [
+        '/overlap/translation/ENSP00000380860?feature=protein_feature',
+        '/overlap/translation/ENSP00000380860?type=Smart;feature=protein_feature'
+    ]
+
+
+def test_lookup_ids_bulk() -> None:
+    ids = [f"ENSG{i:011d}" for i in range(2500)]
+    batches: list[list[str]] = []
+
+    def fake_post(ext: str = '', headers=None, data: str = '', **kwargs) -> dict:
+        assert ext == '/lookup/id?expand=1'
+        batches.append(batch := json.loads(data)['ids'])
+        if len(batches) == 2:
+            return {}  # a failed request
+        return {x: ({'id': x} if x != ids[1] else None) for x in batch}
+
+    with erut.REST_API('GRCh38') as rapi:
+        rapi.endpoint_post_base = fake_post
+        rapi._session.get = lambda url, **kwargs: pytest.fail(f"Unexpected GET {url}")  # pylint: disable=protected-access
+
+        info = rapi.lookup_ids_bulk(ids)
+        assert [len(x) for x in batches] == [1000, 1000, 500]
+        assert [x for batch in batches for x in batch] == ids
+        # the results of the successful batches are merged
+        assert list(info) == ids[:1000] + ids[2000:]
+        assert info[ids[0]] == {'id': ids[0]} and info[ids[1]] is None
+
+        # the found IDs are memoized for lookup_id (with the same options)
+        assert rapi.lookup_id(ids[0], options='expand=1') == {'id': ids[0]}
+        assert rapi.lookup_id(ids[2499], options='expand=1') == {'id': ids[2499]}
+
+
+def test_async_token_bucket_rate() -> None:
+    async def consume_all(bucket: rsut.AsyncTokenBucket, n: int) -> None:
+        await asyncio.gather(*(bucket.consume() for _ in range(n)))
+
+    bucket = rsut.AsyncTokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    asyncio.run(consume_all(bucket, 15))
+    # the first 5 tokens are available immediately, the other 10 are added at 50 tokens per second
+    assert time.monotonic() - start >= 0.19
+
+
+def test_async_lookup_retries_rate_limited_requests() -> None:
+    httpx = pytest.importorskip('httpx')
+    statuses: list[int] = [429, 503, 200]
+    requests_sent: list[str] = []
+
+    def handler(request) -> httpx.Response:
+        requests_sent.append(str(request.url))
+        if (status := statuses.pop(0)) != 200:
+            return httpx.Response(status, headers={'Retry-After': '0'})
+        return httpx.Response(200, json=MET_info)
+
+    async def lookup() -> dict:
+        async with erut.AsyncREST_API('GRCh38') as rapi:
+            await rapi._client.aclose()  # pylint: disable=protected-access
+            rapi._client = httpx.AsyncClient(base_url=rapi.URL, transport=httpx.MockTransport(handler))  # pylint: disable=protected-access
+            return await rapi.gather_lookup_ids(['ENSG00000105976'])
+
+    assert asyncio.run(lookup()) == {'ENSG00000105976': MET_info}
+    assert len(requests_sent) == 3
@@ -0,0 +1,182 @@
+"""
+Activate environment and run "pytest".
+"""
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Utils.utils as u
+
+L = u.Labels
+
+
+def _ids(i: int) -> dict[str,str]:
+    return {L.UniProt_ID: f"P{i}", L.Gene_ID: f"ENSG{i}", L.Gene_name: f"GENE{i}", L.Protein_ID: f"ENSP{i}",
+            L.UniProt_URL: u.get_uniprot_url(f"P{i}")}
+
+Transcripts_domains: dict[str,dict] = {
+    'ENST1': {'domains_df': pd.DataFrame.from_records([
+        {'type': 'Domain', 'start': 1, 'end': 9, 'description': 'Kinase'},
+        {'type': 'Region', 'start': 20, 'end': 30, 'description': 'Disordered, x'}
+    ])} | _ids(1),
+    'ENST2': {'domains_df': pd.DataFrame()} | _ids(2),  # no domains
+    'ENST3': {'domains_df': pd.DataFrame.from_records([
+        {'type': 'Transmembrane', 'start': 5, 'end': 25, 'description': ''}
+    ])} | _ids(3)
+}
+
+def _cnfg(fmt: str) -> dict:
+    return {
+        'Output': {'format': fmt},
+        'IDs': {'show_uniprot_id': True, 'show_gene_id': False, 'show_gene_name': True,
+                'show_protein_id': False, 'show_uniprot_url': False}
+    }
+
+
+def test_generate_output_table_basic() -> None:
+    dfs, sheet_names = u.generate_output_table(_cnfg('basic'), Transcripts_domains)
+    assert list(sheet_names) == [L.Domains] and len(dfs) == 1
+    assert list(dfs[0].index) == [0, 1, 2]
+    assert dfs[0].to_dict(orient='list') == {
+        L.Transcript_ID: ['ENST1', 'ENST1', 'ENST3'],
+        L.UniProt_ID: ['P1', 'P1', 'P3'],
+        L.Gene_name: ['GENE1', 'GENE1', 'GENE3'],
+        'type': ['Domain', 'Region', 'Transmembrane'],
+        'start': [1, 20, 5],
+        'end': [9, 30, 25],
+        'description': ['Kinase', 'Disordered, x', '']
+    }
+
+
+def test_generate_output_table_compact() -> None:
+    dfs, sheet_names = u.generate_output_table(_cnfg('compact'), Transcripts_domains)
+    assert list(sheet_names) == [L.Domains] and len(dfs) == 1
+    assert list(dfs[0].index) == [0, 1, 2]
+    assert dfs[0].to_dict(orient='list') == {
+        L.Transcript_ID: ['ENST1', 'ENST2', 'ENST3'],
+        L.UniProt_ID: ['P1', 'P2', 'P3'],
+        L.Gene_name: ['GENE1', 'GENE2', 'GENE3'],
+        L.Domains: [
+            ('type:Domain,start:1,end:9,description:Kinase|'
+             'type:Region,start:20,end:30,description:Disordered, x'),
+            '',
+            'type:Transmembrane,start:5,end:25,description:'
+        ]
+    }
+
+
+def test_generate_output_table_expanded() -> None:
+    dfs, sheet_names = u.generate_output_table(_cnfg('expanded'), Transcripts_domains)
+    assert list(sheet_names) == ['ENST1', 'ENST3']  # transcripts without domains have no sheet
+    assert [df.to_dict(orient='list') for df in dfs] == [
+        {L.UniProt_ID: ['P1', 'P1'], L.Gene_name: ['GENE1', 'GENE1'], 'type': ['Domain', 'Region'],
+         'start': [1, 20], 'end': [9, 30], 'description': ['Kinase', 'Disordered, x']},
+        {L.UniProt_ID: ['P3'], L.Gene_name: ['GENE3'], 'type': ['Transmembrane'],
+         'start': [5], 'end': [25], 'description': ['']}
+    ]
+
+
+def _read_xlsx_cells(filename) -> dict[str,dict[str,str]]:
+    """Returns the cells (cell reference -> value as text) of each sheet of an xlsxwriter excel file."""
+    ns = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+    with zipfile.ZipFile(filename) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+        sheet_names = [x.get('name') for x in workbook.iterfind('m:sheets/m:sheet', ns)]
+        shared: list[str] = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            shared_strings = ET.fromstring(zf.read('xl/sharedStrings.xml'))
+            shared = [''.join(x.itertext()) for x in shared_strings.iterfind('m:si', ns)]
+        sheets: dict = {}
+        for i, name in enumerate(sheet_names, start=1):
+            cells: dict = {}
+            for c in ET.fromstring(zf.read(f"xl/worksheets/sheet{i}.xml")).iter(f"{{{ns['m']}}}c"):
+                match c.get('t'):
+                    case 'inlineStr':
+                        cells[c.get('r')] = ''.join(c.find('m:is', ns).itertext())
+                    case 's':
+                        cells[c.get('r')] = shared[int(c.find('m:v', ns).text)]
+                    case _:
+                        if (v := c.find('m:v', ns)) is not None:
+                            cells[c.get('r')] = v.text
+            sheets[name] = cells
+    return sheets
+
+
+def test_dfs_to_excel_file(tmp_path) -> None:
+    df1 = pd.DataFrame({'name': ['a', None, 'c'], 'value': [1.23456, np.nan, 3.0], 'count': [1, 2, 3]})
+    df2 = pd.DataFrame({'x': [10, 20]}, index=pd.Index(['r1', 'r2'], name='row'))
+    filename = tmp_path / 'test.xlsx'
+
+    u.dfs_to_excel_file([df1, df2], filename, sheet_names=['first', 'second'], na_rep='NA',
+                        float_format='%.2f', extra_width=2)
+    sheets = _read_xlsx_cells(filename)
+    assert list(sheets) == ['first', 'second']
+    assert sheets['first'] == {
+        'A1': 'name', 'B1': 'value', 'C1': 'count',
+        'A2': 'a', 'B2': '1.23', 'C2': '1',
+        'A3': 'NA', 'B3': 'NA', 'C3': '2',
+        'A4': 'c', 'B4': '3', 'C4': '3'
+    }
+    assert sheets['second'] == {'A1': 'x', 'A2': '10', 'A3': '20'}
+
+    # column widths: the longest value (before float_format) or header, plus extra_width
+    with zipfile.ZipFile(filename) as zf:
+        sheet_xml = zf.read('xl/worksheets/sheet1.xml').decode()
+    widths = [float(x) for x in re.findall(r'<col [^>]*width="([0-9.]+)"', sheet_xml)]
+    # xlsxwriter adds ~0.71 of padding
+    assert [round(x) for x in widths] == [len('name') + 3, len('1.23456') + 3, len('count') + 3]
+
+    u.dfs_to_excel_file([df2], filename, sheet_names=['second'], add_index=True)
+    assert _read_xlsx_cells(filename)['second'] == \
+        {'A1': 'row', 'B1': 'x', 'A2': 'r1', 'B2': '10', 'A3': 'r2', 'B3': '20'}
+
+
+def test_dfs_to_excel_file_sheet_names_mismatch(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        u.dfs_to_excel_file([pd.DataFrame()], tmp_path / 'test.xlsx', sheet_names=[])
+
+
+def test_generate_output_file_csv(tmp_path) -> None:
+    cnfg_data = _cnfg('basic') | {'_output_path': tmp_path / 'out.csv'}
+    u.generate_output_file(cnfg_data, Transcripts_domains)
+    assert (tmp_path / 'out.csv').read_bytes() == (
+        b'Transcript_ID,UniProt_ID,Gene_name,type,start,end,description\n'
+        b'ENST1,P1,GENE1,Domain,1.0,9.0,Kinase\n'
+        b'ENST1,P1,GENE1,Region,20.0,30.0,"Disordered, x"\n'
+        b'ENST3,P3,GENE3,Transmembrane,5.0,25.0,\n'
+    )
+
+
+def test_load_transcripts_text(tmp_path) -> None:
+    (file := tmp_path / 'transcripts.txt').write_text(
+        'transcripts\nENST00000397752\nENST00000495962.1  \n\nENST00000397752\nENSG00000105976\n',
+        encoding='UTF-8')
+    cnfg_data = {'Transcript': {'file': str(file)}, '_transcript_path': file}
+    # as the previous (list based) loader: stripped lines containing ENST, in order, including duplicates
+    with open(file, 'rt', encoding='UTF-8') as fp:
+        expected = [x for x in [line.rstrip() for line in fp] if 'ENST' in x]
+    assert list(u.load_transcripts(cnfg_data)) == expected
+    assert expected == ['ENST00000397752', 'ENST00000495962.1', 'ENST00000397752']
+
+
+def test_load_transcripts_csv(tmp_path) -> None:
+    (file := tmp_path / 'transcripts.csv').write_text(
+        'gene;transcript;score\nMET;ENST00000397752;1.5\nMET;ENST00000495962.1;2\n'
+        'MET;ENST00000397752;3\nEGFR;ENST00000275493;\n',
+        encoding='UTF-8')
+    cnfg_data = {
+        'Transcript': {'file': str(file), 'csv_sep': ';', 'csv_file_transcript_col_name': 'transcript'},
+        '_transcript_path': file
+    }
+    # as the previous loader: the unique values of the transcripts column, in order of appearance
+    expected = pd.read_csv(file, sep=';')['transcript'].unique().tolist()
+    assert u.load_transcripts(cnfg_data) == expected
+    assert expected == ['ENST00000397752', 'ENST00000495962.1', 'ENST00000275493']
+
+    cnfg_data['Transcript']['csv_file_transcript_col_name'] = 'missing'
+    with pytest.raises(ValueError):
+        u.load_transcripts(cnfg_data)